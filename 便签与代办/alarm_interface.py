@@ -6,8 +6,26 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Dict, List, Optional, Any
 import os
+from itertools import islice
 from config_manager import ConfigManager
-from utils import AudioPlayer, find_mp3_files, seconds_to_time, time_to_seconds
+from utils import AudioPlayer, clear_mp3_cache, find_mp3_files, seconds_to_time, time_to_seconds
+
+# 音乐下拉框最多显示的条目数，其余通过输入关键字筛选
+COMBO_MAX_ITEMS = 100
+
+
+def _first_effect_index(trigger: Dict[str, Any]) -> Optional[int]:
+    """获取trigger中第一个特效在specialEffectLibrary中的实际索引"""
+    effect_indices = trigger.get("effectIndices")
+    if not effect_indices:
+        return None
+    first = effect_indices[0]
+    return first if isinstance(first, int) else first[0]
+
+
+def _format_alarm_line(enabled: bool, time_str: str, name: str) -> str:
+    """生成闹钟列表中显示的一行文本"""
+    return f"{'✓' if enabled else '✗'} {time_str} - {name or '未命名'}"
 
 
 class AlarmInterface:
@@ -29,37 +47,40 @@ class AlarmInterface:
         self.type6_effects: List[Dict[str, Any]] = []
         self.mp3_files: List[str] = []
         
+        # 复用的编辑窗口（首次编辑时创建）
+        self._edit_window: Optional[tk.Toplevel] = None
+        
         self._load_data()
+        # 加载mp3文件列表
+        self.mp3_files = find_mp3_files(self.directory)
         self._create_ui()
         self._refresh_alarm_list()
     
     def _load_data(self):
         """加载数据"""
-        # 获取所有特效（用于建立索引映射）
+        # 单次遍历specialEffectLibrary，同时建立type6特效列表及正反向索引映射
         all_effects = self.config_manager.config_data.get("specialEffectLibrary", [])
-        
-        # 建立type6特效在specialEffectLibrary中的实际索引映射
+        self.type6_effects = []
         self.type6_to_actual_index = {}  # type6索引 -> specialEffectLibrary实际索引
-        type6_count = 0
+        actual_to_type6_index = {}  # specialEffectLibrary实际索引 -> type6索引
         for i, effect in enumerate(all_effects):
             if effect.get("type") == 6:
-                self.type6_to_actual_index[type6_count] = i
-                type6_count += 1
-        
-        # 加载type6特效
-        self.type6_effects = self.config_manager.get_type6_effects()
+                t6 = len(self.type6_effects)
+                self.type6_effects.append(effect)
+                self.type6_to_actual_index[t6] = i
+                actual_to_type6_index[i] = t6
         
-        # 加载时间触发配置
-        time_triggers = self.config_manager.get_time_triggers()
-        
-        # 建立实际索引到type6索引的反向映射
-        actual_to_type6_index = {v: k for k, v in self.type6_to_actual_index.items()}
+        # 加载触发配置（记录时间触发在完整列表中的原始索引）
+        meshes = self.config_manager.config_data.get("meshes", [])
+        all_triggers = meshes[0].get("specialEffectTriggers", []) if meshes else []
         
         # 转换为闹钟格式
         self.alarms = []
-        self.trigger_to_alarm_map = {}  # trigger在time_triggers中的索引 -> alarm索引
         
-        for trigger_idx, trigger in enumerate(time_triggers):
+        for raw_idx, trigger in enumerate(all_triggers):
+            if "triggerAtSecondOfDay" not in trigger:
+                continue
+            
             seconds_str = trigger.get("triggerAtSecondOfDay", "0")
             try:
                 seconds = int(seconds_str)
@@ -72,29 +93,38 @@ class AlarmInterface:
             else:
                 enabled = True
             
-            effect_indices = trigger.get("effectIndices", [])
-            if effect_indices and len(effect_indices) > 0:
-                actual_index = effect_indices[0] if isinstance(effect_indices[0], int) else effect_indices[0][0]
-                # 转换为type6索引
-                type6_index = actual_to_type6_index.get(actual_index, -1)
-                if 0 <= type6_index < len(self.type6_effects):
-                    effect = self.type6_effects[type6_index]
-                    alarm = {
-                        "seconds": seconds,
-                        "enabled": enabled,
-                        "name": effect.get("text", ""),
-                        "audio_file": effect.get("audioFileName", ""),
-                        "loop": effect.get("loop", False),
-                        "type6_index": type6_index,  # type6特效列表中的索引
-                        "actual_index": actual_index,  # specialEffectLibrary中的实际索引
-                        "trigger": trigger.copy(),  # 保存完整的trigger对象
-                        "trigger_index": trigger_idx  # trigger在time_triggers中的索引
-                    }
-                    self.alarms.append(alarm)
-                    self.trigger_to_alarm_map[trigger_idx] = len(self.alarms) - 1
+            actual_index = _first_effect_index(trigger)
+            # 转换为type6索引
+            if actual_index in actual_to_type6_index:
+                type6_index = actual_to_type6_index[actual_index]
+                effect = self.type6_effects[type6_index]
+                time_str = seconds_to_time(seconds)
+                name = effect.get("text", "")
+                alarm = {
+                    "seconds": seconds,
+                    "_time_str": time_str,  # 缓存的显示时间
+                    "_display": _format_alarm_line(enabled, time_str, name),  # 缓存的列表显示文本
+                    "enabled": enabled,
+                    "name": name,
+                    "audio_file": effect.get("audioFileName", ""),
+                    "loop": effect.get("loop", False),
+                    "type6_index": type6_index,  # type6特效列表中的索引
+                    "actual_index": actual_index,  # specialEffectLibrary中的实际索引
+                    "trigger": trigger.copy(),  # 保存完整的trigger对象
+                    "raw_trigger_index": raw_idx  # trigger在specialEffectTriggers中的索引
+                }
+                self.alarms.append(alarm)
         
-        # 加载mp3文件列表
-        self.mp3_files = find_mp3_files(self.directory)
+        # 记录加载时的闹钟指纹，用于判断保存时是否有变化
+        self._alarms_fingerprint = self._compute_fingerprint()
+    
+    def _compute_fingerprint(self) -> tuple:
+        """计算当前闹钟列表的指纹（包含原始触发索引，删除或新增闹钟后指纹必然变化）"""
+        return tuple(
+            (a["seconds"], a["enabled"], a["name"], a["audio_file"], a["loop"], a["type6_index"],
+             a["raw_trigger_index"])
+            for a in self.alarms
+        )
     
     def _create_ui(self):
         """创建界面"""
@@ -126,16 +156,20 @@ class AlarmInterface:
         
         ttk.Button(button_frame, text="添加闹钟", command=self._add_alarm).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="删除闹钟", command=self._delete_alarm).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="刷新音乐", command=self._refresh_mp3_files).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="保存", command=self._save_alarms).pack(side=tk.RIGHT)
     
     def _refresh_alarm_list(self):
         """刷新闹钟列表显示"""
+        # 一次性清空并批量插入，避免逐行插入引发的多次重绘
         self.alarm_listbox.delete(0, tk.END)
-        for alarm in self.alarms:
-            status = "✓" if alarm["enabled"] else "✗"
-            time_str = seconds_to_time(alarm["seconds"])
-            name = alarm["name"] if alarm["name"] else "未命名"
-            self.alarm_listbox.insert(tk.END, f"{status} {time_str} - {name}")
+        if self.alarms:
+            self.alarm_listbox.insert(tk.END, *[alarm["_display"] for alarm in self.alarms])
+    
+    def _refresh_mp3_files(self):
+        """重新扫描目录下的mp3文件"""
+        clear_mp3_cache()
+        self.mp3_files = find_mp3_files(self.directory)
     
     def _on_alarm_select(self, event):
         """选择闹钟时的事件处理"""
@@ -150,22 +184,20 @@ class AlarmInterface:
     
     def _edit_alarm(self, index: int):
         """编辑闹钟（index=-1表示新建）"""
-        # 创建编辑窗口
-        edit_window = tk.Toplevel(self.window)
-        edit_window.title("编辑闹钟" if index >= 0 else "添加闹钟")
-        edit_window.geometry("400x350")
-        edit_window.transient(self.window)
-        edit_window.grab_set()
+        # 编辑窗口只创建一次，之后重复使用
+        if self._edit_window is None:
+            self._create_edit_window()
         
         # 获取当前闹钟数据
         if index >= 0:
-            alarm = self.alarms[index].copy()
+            alarm = self.alarms[index]
             # 确保actual_index存在
             if "actual_index" not in alarm or alarm["actual_index"] is None:
                 alarm["actual_index"] = self.type6_to_actual_index.get(alarm.get("type6_index", 0), -1)
         else:
             alarm = {
                 "seconds": 0,
+                "_time_str": "00:00",
                 "enabled": True,
                 "name": "",
                 "audio_file": "",
@@ -174,163 +206,209 @@ class AlarmInterface:
                 "actual_index": -1
             }
         
+        self._edit_index = index
+        self._edit_original_audio = alarm["audio_file"]
+        self._time_var.set(alarm["_time_str"])
+        self._enabled_var.set(alarm["enabled"])
+        self._name_var.set(alarm["name"])
+        self._audio_var.set(alarm["audio_file"])
+        self._loop_var.set(alarm["loop"])
+        
+        # mp3列表变化或上次经过筛选时才重新填充下拉框
+        if self._combo_files is not self.mp3_files or self._combo_filtered:
+            self._audio_combo['values'] = self.mp3_files[:COMBO_MAX_ITEMS]
+            self._combo_files = self.mp3_files
+            self._combo_filtered = False
+        
+        self._edit_window.title("编辑闹钟" if index >= 0 else "添加闹钟")
+        self._edit_window.deiconify()
+        self._edit_window.lift()
+        self._edit_window.grab_set()
+    
+    def _create_edit_window(self):
+        """创建闹钟编辑窗口（关闭时隐藏而不销毁）"""
+        edit_window = tk.Toplevel(self.window)
+        edit_window.withdraw()
+        edit_window.geometry("400x350")
+        edit_window.transient(self.window)
+        edit_window.protocol("WM_DELETE_WINDOW", self._close_edit_window)
+        
         # 创建表单
         form_frame = ttk.Frame(edit_window, padding="20")
         form_frame.pack(fill=tk.BOTH, expand=True)
         
         # 时间设置
         ttk.Label(form_frame, text="时间 (HH:MM):").grid(row=0, column=0, sticky=tk.W, pady=5)
-        time_var = tk.StringVar(value=seconds_to_time(alarm["seconds"]))
-        time_entry = ttk.Entry(form_frame, textvariable=time_var, width=10)
+        self._time_var = tk.StringVar()
+        time_entry = ttk.Entry(form_frame, textvariable=self._time_var, width=10)
         time_entry.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         
         # 启用状态
-        enabled_var = tk.BooleanVar(value=alarm["enabled"])
-        ttk.Checkbutton(form_frame, text="启用", variable=enabled_var).grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=5)
+        self._enabled_var = tk.BooleanVar()
+        ttk.Checkbutton(form_frame, text="启用", variable=self._enabled_var).grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=5)
         
         # 名称
         ttk.Label(form_frame, text="名称:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        name_var = tk.StringVar(value=alarm["name"])
-        name_entry = ttk.Entry(form_frame, textvariable=name_var, width=30)
+        self._name_var = tk.StringVar()
+        name_entry = ttk.Entry(form_frame, textvariable=self._name_var, width=30)
         name_entry.grid(row=2, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         
         # 音乐文件
         ttk.Label(form_frame, text="音乐:").grid(row=3, column=0, sticky=tk.W, pady=5)
-        audio_var = tk.StringVar(value=alarm["audio_file"])
-        audio_combo = ttk.Combobox(form_frame, textvariable=audio_var, values=self.mp3_files, width=27, state="readonly")
-        audio_combo.grid(row=3, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        self._audio_var = tk.StringVar()
+        self._audio_combo = ttk.Combobox(form_frame, textvariable=self._audio_var, width=27)
+        self._audio_combo.grid(row=3, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        self._audio_combo.bind('<KeyRelease>', self._filter_audio_options)
+        self._combo_files = None
+        self._combo_filtered = False
         
         # 试听按钮
-        def play_preview():
-            audio_file = audio_var.get()
-            if audio_file:
-                file_path = os.path.join(self.directory, audio_file)
-                self.audio_player.play_audio(file_path, loop_var.get())
-        
-        ttk.Button(form_frame, text="试听", command=play_preview).grid(row=3, column=2, padx=(5, 0))
+        ttk.Button(form_frame, text="试听", command=self._play_preview).grid(row=3, column=2, padx=(5, 0))
         
         # 循环播放
-        loop_var = tk.BooleanVar(value=alarm["loop"])
-        ttk.Checkbutton(form_frame, text="循环播放", variable=loop_var).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=5)
+        self._loop_var = tk.BooleanVar()
+        ttk.Checkbutton(form_frame, text="循环播放", variable=self._loop_var).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=5)
         
         # 按钮框架
         button_frame = ttk.Frame(form_frame)
         button_frame.grid(row=5, column=0, columnspan=3, pady=20)
         
-        def save_alarm():
-            # 验证时间
-            time_str = time_var.get()
-            seconds = time_to_seconds(time_str)
-            if seconds < 0:
-                messagebox.showerror("错误", "时间格式不正确，请使用 HH:MM 格式")
-                return
+        ttk.Button(button_frame, text="确定", command=self._save_edited_alarm).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="取消", command=self._close_edit_window).pack(side=tk.LEFT, padx=5)
+        
+        self._edit_window = edit_window
+    
+    def _filter_audio_options(self, event=None):
+        """根据输入的关键字筛选音乐下拉框，最多显示COMBO_MAX_ITEMS条"""
+        keyword = self._audio_var.get().strip().lower()
+        if keyword:
+            matches = list(islice((f for f in self.mp3_files if keyword in f.lower()), COMBO_MAX_ITEMS))
+        else:
+            matches = self.mp3_files[:COMBO_MAX_ITEMS]
+        self._audio_combo['values'] = matches
+        self._combo_filtered = True
+    
+    def _play_preview(self):
+        """试听当前选择的音乐"""
+        audio_file = self._audio_var.get()
+        if audio_file:
+            file_path = os.path.join(self.directory, audio_file)
+            self.audio_player.play_audio(file_path, self._loop_var.get())
+    
+    def _close_edit_window(self):
+        """停止试听并隐藏编辑窗口"""
+        self.audio_player.stop_audio()
+        self._edit_window.grab_release()
+        self._edit_window.withdraw()
+    
+    def _save_edited_alarm(self):
+        """保存编辑窗口中的闹钟"""
+        # 验证时间
+        time_str = self._time_var.get()
+        seconds = time_to_seconds(time_str)
+        if seconds < 0:
+            messagebox.showerror("错误", "时间格式不正确，请使用 HH:MM 格式")
+            return
+        
+        # 下拉框可输入筛选，需确认选择的是目录中存在的音乐（保留原有设置除外）
+        audio_file = self._audio_var.get()
+        if audio_file and audio_file != self._edit_original_audio and audio_file not in self.mp3_files:
+            messagebox.showerror("错误", "请从列表中选择目录下存在的音乐文件")
+            return
+        
+        # 停止试听
+        self.audio_player.stop_audio()
+        
+        index = self._edit_index
+        if index >= 0:
+            # 更新现有闹钟
+            old_alarm = self.alarms[index]
+            type6_index = old_alarm["type6_index"]
+            actual_index = old_alarm["actual_index"]
             
-            # 停止试听
-            self.audio_player.stop_audio()
+            # 更新对应的type6特效（保留原有字段，只更新text、audioFileName和loop）
+            effect_data = self.type6_effects[type6_index].copy()
+            effect_data["text"] = self._name_var.get()
+            if self._audio_var.get():
+                effect_data["audioFileName"] = self._audio_var.get()
+            else:
+                effect_data.pop("audioFileName", None)
             
-            if index >= 0:
-                # 更新现有闹钟
-                old_alarm = self.alarms[index]
-                type6_index = old_alarm["type6_index"]
-                actual_index = old_alarm["actual_index"]
-                
-                # 获取原有的type6特效，保留其他字段
-                old_effect = self.type6_effects[type6_index].copy()
-                
-                # 更新对应的type6特效（保留原有字段，只更新text、audioFileName和loop）
-                effect_data = old_effect.copy()
-                effect_data["text"] = name_var.get()
-                if audio_var.get():
-                    effect_data["audioFileName"] = audio_var.get()
-                else:
-                    effect_data.pop("audioFileName", None)
-                
-                if loop_var.get():
-                    effect_data["loop"] = True
-                else:
-                    effect_data.pop("loop", None)
-                
-                self.config_manager.set_type6_effect(type6_index, effect_data)
-                
-                # 更新trigger（保留原有trigger的其他字段）
-                trigger = old_alarm.get("trigger", {}).copy()
-                trigger["triggerAtSecondOfDay"] = str(seconds if enabled_var.get() else seconds + 100000)
-                trigger["effectIndices"] = [actual_index]
-                
-                alarm_data = {
-                    "seconds": seconds,
-                    "enabled": enabled_var.get(),
-                    "name": name_var.get(),
-                    "audio_file": audio_var.get(),
-                    "loop": loop_var.get(),
-                    "type6_index": type6_index,
-                    "actual_index": actual_index,
-                    "trigger": trigger,
-                    "trigger_index": old_alarm["trigger_index"]
-                }
-                self.alarms[index] = alarm_data
+            if self._loop_var.get():
+                effect_data["loop"] = True
             else:
-                # 添加新闹钟
-                # 创建新的type6特效
-                effect_data = {
-                    "type": 6,
-                    "image1FileName": "dhk.png",  # 默认值，可以后续扩展
-                    "initialScale": 0.5,
-                    "finalScale": 1,
-                    "initialRotation": 90,
-                    "finalRotation": 0,
-                    "alignLeftPercent": 0.52,
-                    "alignRightPercent": -1,
-                    "verticalFromBottomPercent": 85,
-                    "text": name_var.get(),
-                    "scaleDuration": 500,
-                    "fadeOutDuration": -1
-                }
-                
-                if audio_var.get():
-                    effect_data["audioFileName"] = audio_var.get()
-                
-                if loop_var.get():
-                    effect_data["loop"] = True
-                
-                actual_index = self.config_manager.add_type6_effect(effect_data)
-                
-                # 重新加载以更新索引映射
-                old_alarm_count = len(self.alarms)
-                self._load_data()
-                
-                # 找到新添加的闹钟对应的type6_index
-                type6_index = None
-                for t6_idx, act_idx in self.type6_to_actual_index.items():
-                    if act_idx == actual_index:
-                        type6_index = t6_idx
-                        break
-                
-                if type6_index is not None:
-                    # 创建新的trigger
-                    trigger = {
-                        "triggerAtSecondOfDay": str(seconds if enabled_var.get() else seconds + 100000),
-                        "effectIndices": [actual_index]
-                    }
-                    
-                    alarm_data = {
-                        "seconds": seconds,
-                        "enabled": enabled_var.get(),
-                        "name": name_var.get(),
-                        "audio_file": audio_var.get(),
-                        "loop": loop_var.get(),
-                        "type6_index": type6_index,
-                        "actual_index": actual_index,
-                        "trigger": trigger,
-                        "trigger_index": old_alarm_count
-                    }
-                    self.alarms.append(alarm_data)
+                effect_data.pop("loop", None)
             
-            edit_window.destroy()
-            self._refresh_alarm_list()
+            self.config_manager.set_type6_effect(type6_index, effect_data)
+            self.type6_effects[type6_index] = effect_data
+            
+            # 更新trigger（保留原有trigger的其他字段；alarm中保存的已是副本，直接修改）
+            trigger = old_alarm.setdefault("trigger", {})
+            trigger["triggerAtSecondOfDay"] = str(seconds if self._enabled_var.get() else seconds + 100000)
+            trigger["effectIndices"] = [actual_index]
+            
+            old_alarm["seconds"] = seconds
+            old_alarm["_time_str"] = seconds_to_time(seconds)
+            old_alarm["enabled"] = self._enabled_var.get()
+            old_alarm["name"] = self._name_var.get()
+            old_alarm["audio_file"] = self._audio_var.get()
+            old_alarm["loop"] = self._loop_var.get()
+            old_alarm["_display"] = _format_alarm_line(old_alarm["enabled"], old_alarm["_time_str"], old_alarm["name"])
+        else:
+            # 添加新闹钟
+            # 创建新的type6特效
+            effect_data = {
+                "type": 6,
+                "image1FileName": "dhk.png",  # 默认值，可以后续扩展
+                "initialScale": 0.5,
+                "finalScale": 1,
+                "initialRotation": 90,
+                "finalRotation": 0,
+                "alignLeftPercent": 0.52,
+                "alignRightPercent": -1,
+                "verticalFromBottomPercent": 85,
+                "text": self._name_var.get(),
+                "scaleDuration": 500,
+                "fadeOutDuration": -1
+            }
+            
+            if self._audio_var.get():
+                effect_data["audioFileName"] = self._audio_var.get()
+            
+            if self._loop_var.get():
+                effect_data["loop"] = True
+            
+            actual_index = self.config_manager.add_type6_effect(effect_data)
+            
+            # 增量更新本地索引映射
+            type6_index = len(self.type6_effects)
+            self.type6_effects.append(effect_data)
+            self.type6_to_actual_index[type6_index] = actual_index
+            
+            # 创建新的trigger
+            trigger = {
+                "triggerAtSecondOfDay": str(seconds if self._enabled_var.get() else seconds + 100000),
+                "effectIndices": [actual_index]
+            }
+            
+            time_str = seconds_to_time(seconds)
+            alarm_data = {
+                "seconds": seconds,
+                "_time_str": time_str,
+                "_display": _format_alarm_line(self._enabled_var.get(), time_str, self._name_var.get()),
+                "enabled": self._enabled_var.get(),
+                "name": self._name_var.get(),
+                "audio_file": self._audio_var.get(),
+                "loop": self._loop_var.get(),
+                "type6_index": type6_index,
+                "actual_index": actual_index,
+                "trigger": trigger,
+                "raw_trigger_index": -1  # 尚未写入配置
+            }
+            self.alarms.append(alarm_data)
         
-        ttk.Button(button_frame, text="确定", command=save_alarm).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="取消", command=lambda: (self.audio_player.stop_audio(), edit_window.destroy())).pack(side=tk.LEFT, padx=5)
+        self._close_edit_window()
+        self._refresh_alarm_list()
     
     def _delete_alarm(self):
         """删除闹钟"""
@@ -341,57 +419,51 @@ class AlarmInterface:
         
         if messagebox.askyesno("确认", "确定要删除选中的闹钟吗？"):
             index = selection[0]
-            alarm = self.alarms[index]
+            alarm = self.alarms.pop(index)
             
             # 先删除对应的trigger
-            self._remove_time_trigger(alarm["trigger_index"])
-            
-            # 获取要删除的actual_index
-            actual_index_to_delete = alarm["actual_index"]
+            raw_trigger_index = alarm["raw_trigger_index"]
+            self._remove_time_trigger(raw_trigger_index)
             
             # 删除对应的type6特效（这会改变索引）
             type6_index = alarm["type6_index"]
+            actual_index = self.type6_to_actual_index.get(type6_index, alarm["actual_index"])
             self.config_manager.remove_type6_effect(type6_index)
             
-            # 重新加载数据以更新索引映射（因为删除特效后索引会变化）
-            self._load_data()
+            # 增量更新索引映射：后续type6索引前移一位，实际索引大于被删除项的减一
+            self.type6_effects.pop(type6_index)
+            self.type6_to_actual_index = {
+                (t6 if t6 < type6_index else t6 - 1): (act if act < actual_index else act - 1)
+                for t6, act in self.type6_to_actual_index.items()
+                if t6 != type6_index
+            }
+            for other in self.alarms:
+                if other["type6_index"] > type6_index:
+                    other["type6_index"] -= 1
+                if other["actual_index"] > actual_index:
+                    other["actual_index"] -= 1
+                if raw_trigger_index >= 0 and other["raw_trigger_index"] > raw_trigger_index:
+                    other["raw_trigger_index"] -= 1
+            
             self._refresh_alarm_list()
     
-    def _remove_time_trigger(self, trigger_index: int):
-        """删除指定索引的时间触发配置"""
-        if not self.config_manager.config_data:
-            return
-        
-        meshes = self.config_manager.config_data.get("meshes", [])
-        if not meshes:
-            return
-        
-        triggers = meshes[0].get("specialEffectTriggers", [])
-        time_triggers = [t for t in triggers if "triggerAtSecondOfDay" in t]
-        
-        if 0 <= trigger_index < len(time_triggers):
-            # 找到要删除的trigger在完整列表中的位置
-            time_trigger = time_triggers[trigger_index]
-            # 通过比较triggerAtSecondOfDay和effectIndices来找到要删除的trigger
-            for i, trigger in enumerate(triggers):
-                if trigger.get("triggerAtSecondOfDay") == time_trigger.get("triggerAtSecondOfDay") and \
-                   trigger.get("effectIndices") == time_trigger.get("effectIndices"):
-                    triggers.pop(i)
-                    break
+    def _remove_time_trigger(self, raw_trigger_index: int):
+        """删除specialEffectTriggers中指定原始索引的时间触发配置"""
+        self.config_manager.remove_trigger(raw_trigger_index)
     
     def _save_alarms(self):
         """保存闹钟配置"""
-        # 重新建立索引映射（因为可能删除了特效，索引会变化）
-        all_effects = self.config_manager.config_data.get("specialEffectLibrary", [])
-        type6_to_actual_index = {}
-        type6_count = 0
-        for i, effect in enumerate(all_effects):
-            if effect.get("type") == 6:
-                type6_to_actual_index[type6_count] = i
-                type6_count += 1
+        # 闹钟未发生变化时无需重新构建触发配置和写入文件
+        if self._compute_fingerprint() == self._alarms_fingerprint:
+            messagebox.showinfo("提示", "闹钟配置没有变化")
+            return
+        
+        # 获取最新的索引映射（因为可能删除了特效，索引会变化）
+        type6_to_actual_index = self.config_manager.get_type6_index_map()
         
         # 构建时间触发配置
         triggers = []
+        saved_alarms = []
         for alarm in self.alarms:
             seconds = alarm["seconds"]
             if not alarm["enabled"]:
@@ -407,15 +479,21 @@ class AlarmInterface:
                 trigger["triggerAtSecondOfDay"] = str(seconds)
                 trigger["effectIndices"] = [actual_index]
                 triggers.append(trigger)
+                alarm["actual_index"] = actual_index
+                saved_alarms.append(alarm)
         
         # 保存到配置管理器
-        self.config_manager.set_time_triggers(triggers)
+        offset = self.config_manager.set_time_triggers(triggers)
         
         # 保存配置文件
         if self.config_manager.save_config():
             messagebox.showinfo("成功", "闹钟配置已保存")
-            # 重新加载以同步数据并更新索引
-            self._load_data()
+            # 内存中的闹钟即为刚保存的内容，直接同步索引，无需重新解析配置
+            self.alarms = saved_alarms
+            for i, (alarm, trigger) in enumerate(zip(saved_alarms, triggers)):
+                alarm["trigger"] = trigger.copy()
+                alarm["raw_trigger_index"] = offset + i
+            self._alarms_fingerprint = self._compute_fingerprint()
             self._refresh_alarm_list()
         else:
             messagebox.showerror("错误", "保存配置失败")
@@ -11,7 +11,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 args = [
     'main.py',  # 主程序入口
     '--name=ConfigEditor',  # 生成的exe名称
-    '--onefile',  # 打包成单个exe文件
+    '--onedir',  # 打包成文件夹，启动时无需解压到临时目录，冷启动更快
     '--windowed',  # 不显示控制台窗口（GUI应用）
     '--clean',  # 清理临时文件
     '--noconfirm',  # 覆盖输出目录而不询问
@@ -19,7 +19,10 @@ args = [
     '--hidden-import=pygame',  # 确保pygame被包含
     '--hidden-import=tkinter',  # 确保tkinter被包含
     '--hidden-import=json',  # 确保json被包含
-    '--collect-all=pygame',  # 收集pygame的所有数据文件
+    '--hidden-import=orjson',  # 可选的快速JSON库（未安装时自动使用json）
+    '--collect-submodules=pygame',  # 只收集pygame的子模块，不再打包全部数据文件
+    '--exclude-module=pygame.tests',  # 排除pygame自带的测试
+    '--exclude-module=tkinter.test',  # 排除tkinter自带的测试
     '--icon=NONE',  # 如果有图标文件，可以指定路径
 ]
 
@@ -2,10 +2,33 @@
 配置管理器模块
 处理JSON文件的读取、保存和目录记忆功能
 """
+import hashlib
 import json
 import os
+import tempfile
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Tuple, Any
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时退回标准库json
+    orjson = None
+
+
+def _dumps(data: Any) -> bytes:
+    """将配置序列化为UTF-8编码的JSON（缩进2格，不转义非ASCII字符）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Any:
+    """解析UTF-8编码的JSON"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
 
 
 class ConfigManager:
@@ -15,6 +38,28 @@ class ConfigManager:
         self.config_path = None
         self.config_data: Optional[Dict[str, Any]] = None
         self.history_file = "config_history.json"
+        # 后台线程切换目录、加载或保存配置时持有，保证配置状态不被并发修改
+        self.lock = threading.RLock()
+        # type6特效缓存：过滤后的列表及 type6索引 -> specialEffectLibrary实际索引 映射
+        self._type6_cache: List[Dict[str, Any]] = []
+        self._type6_index_map: Dict[int, int] = {}
+        self._cache_dirty = True
+        # 触发配置按是否带triggerAtSecondOfDay分区缓存（加载配置时重建），避免每次访问重新过滤
+        self._time_triggers: List[Dict[str, Any]] = []
+        self._non_time_triggers: List[Dict[str, Any]] = []
+        # 每个配置文件最近一次写入的 (快照序号, 内容哈希)，用于跳过无变化的保存及丢弃过期快照；
+        # 由_write_lock保护，保证多个保存（前台或后台线程）按快照顺序落盘
+        self._write_lock = threading.Lock()
+        self._save_seq = 0
+        self._disk_state: Dict[str, Tuple[int, bytes]] = {}
+        # 已解析配置对应的文件状态 (路径, mtime_ns, 大小)，以及内存中是否有未保存的修改
+        self._loaded_key: Optional[Tuple[str, int, int]] = None
+        self._modified = False
+        # set_directory检查文件时得到的文件状态，供紧接着的reload_if_changed使用，免去再次stat
+        self._pending_key: Optional[Tuple[str, int, int]] = None
+        # 目录历史记录内存缓存，首次访问时从文件加载
+        self._history_cache: Optional[Deque[str]] = None
+        self._history_last_written: Optional[List[str]] = None
     
     def set_directory(self, directory: str) -> bool:
         """
@@ -27,25 +72,52 @@ class ConfigManager:
             bool: 如果config.json存在返回True，否则返回False
         """
         config_file = os.path.join(directory, "config.json")
-        if os.path.exists(config_file):
-            self.config_path = config_file
-            self.save_directory_to_history(directory)
-            return True
-        return False
+        try:
+            st = os.stat(config_file)
+        except OSError:
+            self._pending_key = None
+            return False
+        self.config_path = config_file
+        self._pending_key = (config_file, st.st_mtime_ns, st.st_size)
+        self.save_directory_to_history(directory)
+        return True
     
-    def load_config(self) -> bool:
+    def load_config(self, _key: Optional[Tuple[str, int, int]] = None) -> bool:
         """
         加载config.json文件
         
+        Args:
+            _key: 调用方已获取的文件状态，传入时不再重复stat
+        
         Returns:
             bool: 加载成功返回True，否则返回False
         """
-        if not self.config_path or not os.path.exists(self.config_path):
+        with self.lock:
+            return self._load_config_locked(_key)
+    
+    def _load_config_locked(self, _key: Optional[Tuple[str, int, int]]) -> bool:
+        """在持有锁的情况下加载config.json"""
+        if not self.config_path:
+            return False
+        key = _key or self._stat_key()
+        if key is None:
             return False
         
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self.config_data = json.load(f)
+            with open(self.config_path, 'rb') as f:
+                raw = f.read()
+            self.config_data = _loads(raw)
+            # 解析后一次性补全便签的visible默认值，界面直接使用即可
+            for note in self.config_data.get("notes", []):
+                note.setdefault("visible", True)
+            digest = hashlib.blake2b(raw, digest_size=16).digest()
+            with self._write_lock:
+                seq = self._disk_state.get(self.config_path, (0, None))[0]
+                self._disk_state[self.config_path] = (seq, digest)
+            self._loaded_key = key
+            self._modified = False
+            self._cache_dirty = True
+            self._partition_triggers()
             return True
         except Exception as e:
             print(f"加载配置失败: {e}")
@@ -58,19 +130,123 @@ class ConfigManager:
         Returns:
             bool: 保存成功返回True，否则返回False
         """
-        if not self.config_path or not self.config_data:
-            return False
+        with self.lock:
+            snapshot = self.prepare_save()
+            if snapshot is None:
+                return False
+            return self.finish_save(snapshot, self.write_snapshot(snapshot))
+    
+    def prepare_save(self) -> Optional[Tuple[str, Dict[str, Any], bytes, bytes, int]]:
+        """
+        序列化当前配置，生成待写入的快照（需在修改配置的线程中调用）
         
-        try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config_data, f, ensure_ascii=False, indent=2)
+        Returns:
+            (路径, 配置对象, 待写入内容, 哈希, 快照序号)，没有可保存的配置或序列化失败时返回None
+        """
+        with self.lock:
+            if not self.config_path or not self.config_data:
+                return None
+            try:
+                buf = _dumps(self.config_data)
+            except Exception as e:
+                print(f"保存配置失败: {e}")
+                return None
+            # 快照已包含此前的全部修改，之后的编辑会重新标记
+            self._modified = False
+            self._save_seq += 1
+            digest = hashlib.blake2b(buf, digest_size=16).digest()
+            return self.config_path, self.config_data, buf, digest, self._save_seq
+    
+    def write_snapshot(self, snapshot: Tuple[str, Dict[str, Any], bytes, bytes, int]
+                       ) -> Optional[Tuple[str, int, int]]:
+        """
+        将快照内容写入磁盘（只使用快照中的数据，可在后台线程调用）
+        
+        同一文件已写入更新的快照时丢弃此快照，内容与上次写入相同时跳过磁盘写入
+        
+        Returns:
+            写入后文件的 (路径, mtime_ns, 大小)，失败返回None
+        """
+        path, _, buf, digest, seq = snapshot
+        with self._write_lock:
+            try:
+                last_seq, last_digest = self._disk_state.get(path, (0, None))
+                if seq > last_seq and digest != last_digest:
+                    # 先写入唯一的临时文件再替换，避免写入中断导致配置文件损坏
+                    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='config.', suffix='.tmp')
+                    try:
+                        with os.fdopen(fd, 'wb') as f:
+                            f.write(buf)
+                        os.replace(tmp_path, path)
+                    except BaseException:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+                        raise
+                if seq > last_seq:
+                    self._disk_state[path] = (seq, digest)
+                st = os.stat(path)
+                return (path, st.st_mtime_ns, st.st_size)
+            except Exception as e:
+                print(f"保存配置失败: {e}")
+                return None
+    
+    def finish_save(self, snapshot: Tuple[str, Dict[str, Any], bytes, bytes, int],
+                    key: Optional[Tuple[str, int, int]]) -> bool:
+        """
+        根据写入结果更新保存状态（需在修改配置的线程中调用）
+        
+        Args:
+            snapshot: prepare_save返回的快照
+            key: write_snapshot的返回值
+            
+        Returns:
+            bool: 保存成功返回True，否则返回False
+        """
+        path, data, _, _, seq = snapshot
+        with self.lock:
+            # 期间切换或重新加载了配置时，不影响当前配置的状态
+            if path != self.config_path or data is not self.config_data:
+                return key is not None
+            if key is None:
+                # 未能写入，保留修改标记以免下次打开时丢失内存中的修改
+                self._modified = True
+                return False
+            # 仅当磁盘上是本次快照时更新文件状态，以免下次打开时重复解析；
+            # 已被更新的快照取代时，其内容包含本次快照的全部修改
+            with self._write_lock:
+                latest = self._disk_state.get(path, (0, None))[0] == seq
+            if latest:
+                self._loaded_key = key
             return True
-        except Exception as e:
-            print(f"保存配置失败: {e}")
+    
+    def _stat_key(self) -> Optional[Tuple[str, int, int]]:
+        """获取配置文件的 (路径, mtime_ns, 大小)，文件不存在时返回None"""
+        try:
+            st = os.stat(self.config_path)
+        except (OSError, TypeError):
+            return None
+        return (self.config_path, st.st_mtime_ns, st.st_size)
+    
+    def reload_if_changed(self) -> bool:
+        """
+        仅在配置文件发生变化或内存中有未保存的修改时重新加载config.json
+        
+        Returns:
+            bool: 配置可用返回True，否则返回False
+        """
+        key, self._pending_key = self._pending_key or self._stat_key(), None
+        if key is None:
             return False
+        if self.config_data is not None and not self._modified and key == self._loaded_key:
+            return True
+        return self.load_config(key)
+    
+    def mark_modified(self):
+        """标记内存中的配置已被修改但尚未保存"""
+        self._modified = True
     
     def get_notes(self) -> List[Dict[str, Any]]:
-        """获取便签列表"""
+        """获取便签列表（直接返回配置中的列表，加载时已补全visible字段）"""
         if not self.config_data:
             return []
         return self.config_data.get("notes", [])
@@ -79,68 +255,114 @@ class ConfigManager:
         """设置便签列表"""
         if self.config_data:
             self.config_data["notes"] = notes
+            self._modified = True
+    
+    def _rebuild_type6_cache(self):
+        """单次遍历specialEffectLibrary，重建type6特效缓存和索引映射"""
+        self._type6_cache = []
+        self._type6_index_map = {}
+        library = self.config_data.get("specialEffectLibrary", []) if self.config_data else []
+        for i, effect in enumerate(library):
+            if effect.get("type") == 6:
+                self._type6_index_map[len(self._type6_cache)] = i
+                self._type6_cache.append(effect)
+        self._cache_dirty = False
+    
+    def _ensure_type6_cache(self):
+        """缓存失效时重建"""
+        if self._cache_dirty:
+            self._rebuild_type6_cache()
     
     def get_type6_effects(self) -> List[Dict[str, Any]]:
         """获取type6类型的特殊特效"""
         if not self.config_data:
             return []
-        effects = self.config_data.get("specialEffectLibrary", [])
-        return [e for e in effects if e.get("type") == 6]
+        self._ensure_type6_cache()
+        return list(self._type6_cache)
+    
+    def get_type6_index_map(self) -> Dict[int, int]:
+        """获取type6索引到specialEffectLibrary实际索引的映射"""
+        if not self.config_data:
+            return {}
+        self._ensure_type6_cache()
+        return dict(self._type6_index_map)
     
     def set_type6_effect(self, index: int, effect: Dict[str, Any]):
         """设置指定索引的type6特效"""
         if not self.config_data:
             return
         
-        if "specialEffectLibrary" not in self.config_data:
-            self.config_data["specialEffectLibrary"] = []
-        
-        effects = self.config_data["specialEffectLibrary"]
-        # 找到type6特效的索引
-        type6_indices = [i for i, e in enumerate(effects) if e.get("type") == 6]
-        
-        if 0 <= index < len(type6_indices):
-            actual_index = type6_indices[index]
-            effects[actual_index] = effect
+        library = self.config_data.setdefault("specialEffectLibrary", [])
+        self._ensure_type6_cache()
+        actual_index = self._type6_index_map.get(index)
+        if actual_index is not None:
+            library[actual_index] = effect
+            self._modified = True
+            if effect.get("type") == 6:
+                self._type6_cache[index] = effect
+            else:
+                self._cache_dirty = True
     
     def add_type6_effect(self, effect: Dict[str, Any]) -> int:
         """添加新的type6特效，返回在specialEffectLibrary中的索引"""
         if not self.config_data:
             return -1
         
-        if "specialEffectLibrary" not in self.config_data:
-            self.config_data["specialEffectLibrary"] = []
-        
-        self.config_data["specialEffectLibrary"].append(effect)
+        library = self.config_data.setdefault("specialEffectLibrary", [])
+        self._ensure_type6_cache()
+        library.append(effect)
+        self._modified = True
         # 返回新添加的特效在specialEffectLibrary中的索引
-        return len(self.config_data["specialEffectLibrary"]) - 1
+        actual_index = len(library) - 1
+        if effect.get("type") == 6:
+            self._type6_index_map[len(self._type6_cache)] = actual_index
+            self._type6_cache.append(effect)
+        return actual_index
     
     def remove_type6_effect(self, index: int):
         """删除指定索引的type6特效"""
         if not self.config_data:
             return
         
-        effects = self.config_data.get("specialEffectLibrary", [])
-        type6_indices = [i for i, e in enumerate(effects) if e.get("type") == 6]
+        self._ensure_type6_cache()
+        actual_index = self._type6_index_map.get(index)
+        if actual_index is None:
+            return
         
-        if 0 <= index < len(type6_indices):
-            actual_index = type6_indices[index]
-            effects.pop(actual_index)
+        library = self.config_data.setdefault("specialEffectLibrary", [])
+        library.pop(actual_index)
+        self._modified = True
+        self._type6_cache.pop(index)
+        # 后续type6索引前移一位，对应的实际索引减一
+        old_map = self._type6_index_map
+        self._type6_index_map = {
+            t6: (old_map[t6] if t6 < index else old_map[t6 + 1] - 1)
+            for t6 in range(len(self._type6_cache))
+        }
     
     def get_time_triggers(self) -> List[Dict[str, Any]]:
         """获取带triggerAtSecondOfDay的触发配置"""
         if not self.config_data:
             return []
+        return list(self._time_triggers)
+    
+    def set_time_triggers(self, triggers: List[Dict[str, Any]]) -> int:
+        """设置时间触发配置，返回时间触发在specialEffectTriggers中的起始索引（失败返回-1）"""
+        if not self.config_data:
+            return -1
         
         meshes = self.config_data.get("meshes", [])
         if not meshes:
-            return []
+            return -1
         
-        triggers = meshes[0].get("specialEffectTriggers", [])
-        return [t for t in triggers if "triggerAtSecondOfDay" in t]
+        # 合并缓存的非时间触发和新的时间触发
+        self._time_triggers = list(triggers)
+        self._modified = True
+        meshes[0]["specialEffectTriggers"] = self._non_time_triggers + self._time_triggers
+        return len(self._non_time_triggers)
     
-    def set_time_triggers(self, triggers: List[Dict[str, Any]]):
-        """设置时间触发配置"""
+    def remove_trigger(self, raw_index: int):
+        """删除specialEffectTriggers中指定原始索引的触发配置"""
         if not self.config_data:
             return
         
@@ -148,45 +370,71 @@ class ConfigManager:
         if not meshes:
             return
         
-        # 获取所有非时间触发的配置
-        all_triggers = meshes[0].get("specialEffectTriggers", [])
-        non_time_triggers = [t for t in all_triggers if "triggerAtSecondOfDay" not in t]
-        
-        # 合并时间触发和非时间触发
-        meshes[0]["specialEffectTriggers"] = non_time_triggers + triggers
+        triggers = meshes[0].get("specialEffectTriggers", [])
+        if 0 <= raw_index < len(triggers):
+            removed = triggers.pop(raw_index)
+            self._modified = True
+            # 分区缓存与完整列表引用同一批trigger对象，按对象身份从对应分区中移除
+            partition = self._time_triggers if "triggerAtSecondOfDay" in removed else self._non_time_triggers
+            for i, t in enumerate(partition):
+                if t is removed:
+                    partition.pop(i)
+                    break
+    
+    def _partition_triggers(self):
+        """单次遍历触发配置，分别缓存时间触发和非时间触发"""
+        self._time_triggers = []
+        self._non_time_triggers = []
+        meshes = self.config_data.get("meshes", []) if self.config_data else []
+        if meshes:
+            for t in meshes[0].get("specialEffectTriggers", []):
+                (self._time_triggers if "triggerAtSecondOfDay" in t else self._non_time_triggers).append(t)
+    
+    def _load_history(self) -> Deque[str]:
+        """读取目录历史记录（仅首次访问时读取文件，之后使用内存缓存）"""
+        if self._history_cache is None:
+            history = []
+            try:
+                if os.path.exists(self.history_file):
+                    with open(self.history_file, 'r', encoding='utf-8') as f:
+                        history = json.load(f)
+            except Exception as e:
+                print(f"读取目录历史失败: {e}")
+            if not isinstance(history, list):
+                history = []
+            # 只保留最近10个，超出部分由deque自动丢弃
+            self._history_cache = deque(history[:10], maxlen=10)
+            self._history_last_written = list(self._history_cache)
+        return self._history_cache
     
     def save_directory_to_history(self, directory: str):
         """保存目录到历史记录"""
+        history = self._load_history()
+        
+        # 如果目录已存在，先移除
+        try:
+            history.remove(directory)
+        except ValueError:
+            pass
+        
+        # 添加到最前面（超过10个时自动丢弃最旧的）
+        history.appendleft(directory)
+        
+        # 内容未变化时不写文件
+        snapshot = list(history)
+        if snapshot == self._history_last_written:
+            return
+        
         try:
-            history = []
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            
-            # 如果目录已存在，先移除
-            if directory in history:
-                history.remove(directory)
-            
-            # 添加到最前面
-            history.insert(0, directory)
-            
-            # 只保留最近10个
-            history = history[:10]
-            
             with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            self._history_last_written = snapshot
         except Exception as e:
             print(f"保存目录历史失败: {e}")
     
     def get_directory_history(self) -> List[str]:
         """获取目录历史记录"""
-        try:
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"读取目录历史失败: {e}")
-        return []
+        return list(self._load_history())
     
     def get_directory(self) -> Optional[str]:
         """获取当前工作目录"""
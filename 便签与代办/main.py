@@ -5,9 +5,19 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+import queue
+import stat
+import threading
+from typing import List, Optional, Tuple
 from config_manager import ConfigManager
-from alarm_interface import AlarmInterface
-from note_interface import NoteInterface
+
+# 目录加载状态 -> (状态文字模板, 文字颜色, 功能按钮状态)
+STATUS_PRESETS = {
+    "loading": ("正在加载: {directory}", "gray", tk.DISABLED),
+    "loaded": ("✓ 已加载: {directory}", "green", tk.NORMAL),
+    "failed": ("✗ 加载配置文件失败", "red", tk.DISABLED),
+    "missing": ("✗ 未找到config.json文件", "red", tk.DISABLED),
+}
 
 
 class MainWindow:
@@ -21,6 +31,17 @@ class MainWindow:
         self.config_manager = ConfigManager()
         self.current_directory = None
         
+        # 后台加载目录的结果队列，由主线程通过after轮询
+        self._load_queue: queue.Queue = queue.Queue()
+        self._load_seq = 0
+        # 已写入历史记录下拉框的内容，未变化时跳过重新赋值
+        self._history_snapshot: Optional[Tuple[str, ...]] = None
+        # 当前显示的状态文字及功能按钮状态，未变化时不重复配置组件
+        self._last_status: Optional[Tuple[str, str]] = None
+        self._buttons_state = tk.DISABLED
+        # 使用说明窗口（首次打开时创建）
+        self._help_window: Optional[tk.Toplevel] = None
+        
         self._create_ui()
         self._load_last_directory()
     
@@ -90,7 +111,7 @@ class MainWindow:
         """加载上次使用的目录"""
         history = self.config_manager.get_directory_history()
         if history:
-            self.history_combo['values'] = history
+            self._update_history_combo(history)
             # 尝试加载第一个历史记录
             if history:
                 self._set_directory(history[0])
@@ -108,30 +129,72 @@ class MainWindow:
             self._set_directory(directory)
     
     def _set_directory(self, directory: str):
-        """设置工作目录"""
-        self.dir_var.set(directory)
-        self.history_var.set("")
-        
-        # 验证目录
-        if self.config_manager.set_directory(directory):
-            # 加载配置
-            if self.config_manager.load_config():
-                self.current_directory = directory
-                self.status_label.config(text=f"✓ 已加载: {directory}", foreground="green")
-                self.alarm_button.config(state=tk.NORMAL)
-                self.note_button.config(state=tk.NORMAL)
-                
-                # 更新历史记录下拉框
-                history = self.config_manager.get_directory_history()
-                self.history_combo['values'] = history
-            else:
-                self.status_label.config(text="✗ 加载配置文件失败", foreground="red")
-                self.alarm_button.config(state=tk.DISABLED)
-                self.note_button.config(state=tk.DISABLED)
-        else:
-            self.status_label.config(text="✗ 未找到config.json文件", foreground="red")
-            self.alarm_button.config(state=tk.DISABLED)
-            self.note_button.config(state=tk.DISABLED)
+        """设置工作目录（文件检查和配置解析在后台线程进行，避免界面卡顿）"""
+        if self.dir_var.get() != directory:
+            self.dir_var.set(directory)
+        if self.history_var.get():
+            self.history_var.set("")
+        
+        self._apply_state("loading", directory)
+        
+        self._load_seq += 1
+        threading.Thread(target=self._load_directory, args=(self._load_seq, directory), daemon=True).start()
+        self.root.after(50, self._poll_load_queue)
+    
+    def _load_directory(self, seq: int, directory: str):
+        """后台线程：验证目录并加载配置，结果放入队列（此处不能访问任何Tk组件）"""
+        result = "failed"
+        try:
+            # 持有配置管理器的锁，避免与其他线程同时切换或读写配置
+            with self.config_manager.lock:
+                if not self.config_manager.set_directory(directory):
+                    result = "missing"
+                elif self.config_manager.reload_if_changed():
+                    result = "loaded"
+        except Exception as e:
+            print(f"加载目录失败: {e}")
+        finally:
+            # 无论成功与否都放入结果，避免界面一直停留在加载状态
+            self._load_queue.put((seq, directory, result))
+    
+    def _poll_load_queue(self):
+        """主线程轮询后台加载结果"""
+        try:
+            seq, directory, result = self._load_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._poll_load_queue)
+            return
+        
+        # 期间又选择了其他目录时忽略旧结果
+        if seq == self._load_seq:
+            self._on_directory_loaded(directory, result)
+    
+    def _on_directory_loaded(self, directory: str, result: str):
+        """在主线程中根据加载结果更新界面"""
+        self._apply_state(result, directory)
+        if result == "loaded":
+            self.current_directory = directory
+            # 更新历史记录下拉框
+            self._update_history_combo(self.config_manager.get_directory_history())
+    
+    def _apply_state(self, state: str, directory: str = ""):
+        """按STATUS_PRESETS更新状态标签和功能按钮，只配置实际发生变化的组件"""
+        template, color, button_state = STATUS_PRESETS[state]
+        status = (template.format(directory=directory), color)
+        if status != self._last_status:
+            self.status_label.configure(text=status[0], foreground=color)
+            self._last_status = status
+        if button_state != self._buttons_state:
+            self.alarm_button.configure(state=button_state)
+            self.note_button.configure(state=button_state)
+            self._buttons_state = button_state
+    
+    def _update_history_combo(self, history: List[str]):
+        """历史记录有变化时才更新下拉框（赋值values需经Tcl列表序列化）"""
+        snapshot = tuple(history)
+        if snapshot != self._history_snapshot:
+            self.history_combo['values'] = history
+            self._history_snapshot = snapshot
     
     def _validate_directory(self):
         """验证目录"""
@@ -140,9 +203,15 @@ class MainWindow:
             messagebox.showwarning("警告", "请输入目录路径")
             return
         
-        if not os.path.exists(directory):
+        # 只做一次stat，同时判断是否存在以及是否为目录
+        try:
+            st = os.stat(directory)
+        except OSError:
             messagebox.showerror("错误", "目录不存在")
             return
+        if not stat.S_ISDIR(st.st_mode):
+            messagebox.showerror("错误", "不是目录")
+            return
         
         self._set_directory(directory)
     
@@ -152,8 +221,10 @@ class MainWindow:
             messagebox.showwarning("警告", "请先选择工作目录")
             return
         
-        # 重新加载配置以确保数据最新
-        self.config_manager.load_config()
+        # 配置文件有变化或存在未保存的修改时才重新加载
+        self.config_manager.reload_if_changed()
+        # 首次打开时才导入（会间接加载pygame），缩短程序启动时间
+        from alarm_interface import AlarmInterface
         AlarmInterface(self.root, self.config_manager, self.current_directory)
     
     def _open_note_interface(self):
@@ -162,17 +233,32 @@ class MainWindow:
             messagebox.showwarning("警告", "请先选择工作目录")
             return
         
-        # 重新加载配置以确保数据最新
-        self.config_manager.load_config()
+        # 配置文件有变化或存在未保存的修改时才重新加载
+        self.config_manager.reload_if_changed()
+        from note_interface import NoteInterface
         NoteInterface(self.root, self.config_manager)
     
     def _show_help(self):
-        """显示使用说明"""
+        """显示使用说明（窗口只创建一次，之后重复显示）"""
+        if self._help_window is None:
+            self._help_window = self._build_help_window()
+        else:
+            self._help_window.deiconify()
+            self._help_window.lift()
+        self._help_window.grab_set()
+    
+    def _hide_help(self):
+        """隐藏使用说明窗口"""
+        self._help_window.grab_release()
+        self._help_window.withdraw()
+    
+    def _build_help_window(self) -> tk.Toplevel:
+        """创建使用说明窗口"""
         help_window = tk.Toplevel(self.root)
         help_window.title("使用说明")
         help_window.geometry("600x400")
         help_window.transient(self.root)
-        help_window.grab_set()
+        help_window.protocol("WM_DELETE_WINDOW", self._hide_help)
         
         # 主框架
         help_frame = ttk.Frame(help_window, padding="20")
@@ -198,7 +284,9 @@ class MainWindow:
         button_frame = ttk.Frame(help_frame)
         button_frame.pack(fill=tk.X, pady=(20, 0))
         
-        ttk.Button(button_frame, text="我知道了", command=help_window.destroy).pack()
+        ttk.Button(button_frame, text="我知道了", command=self._hide_help).pack()
+        
+        return help_window
     
     def run(self):
         """运行主程序"""
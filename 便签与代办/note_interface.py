@@ -2,6 +2,8 @@
 便签排布界面模块
 用于编辑notes配置
 """
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from typing import Dict, List, Optional, Any
@@ -22,6 +24,11 @@ class NoteInterface:
         
         # 数据存储
         self.notes: List[Dict[str, Any]] = []
+        # 每个便签对应的Treeview行iid（与self.notes按索引一一对应）
+        self._note_iids: List[str] = []
+        self._next_iid = 0
+        # 后台保存结果队列，由主线程通过after轮询
+        self._save_queue: queue.Queue = queue.Queue()
         
         self._load_data()
         self._create_ui()
@@ -29,11 +36,8 @@ class NoteInterface:
     
     def _load_data(self):
         """加载数据"""
+        # ConfigManager加载配置时已为每个便签补全visible字段
         self.notes = self.config_manager.get_notes()
-        # 确保每个便签都有visible字段
-        for note in self.notes:
-            if "visible" not in note:
-                note["visible"] = True
     
     def _create_ui(self):
         """创建界面"""
@@ -75,22 +79,38 @@ class NoteInterface:
         ttk.Button(button_frame, text="添加便签", command=self._add_note).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="编辑便签", command=self._edit_selected_note).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="删除便签", command=self._delete_note).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="保存", command=self._save_notes).pack(side=tk.RIGHT)
+        self.save_button = ttk.Button(button_frame, text="保存", command=self._save_notes)
+        self.save_button.pack(side=tk.RIGHT)
     
     def _refresh_note_list(self):
-        """刷新便签列表显示"""
+        """刷新便签列表显示（仅用于初次加载，之后的增删改只更新受影响的行）"""
         # 清空现有项
-        for item in self.note_tree.get_children():
-            self.note_tree.delete(item)
+        self.note_tree.delete(*self.note_tree.get_children())
+        self._note_iids = []
         
-        # 添加便签
+        # 添加便签：直接调用Tcl命令批量插入，跳过ttk.Treeview.insert的参数包装
+        tk_call = self.note_tree.tk.call
+        widget = self.note_tree._w
+        note_values = self._note_values
         for i, note in enumerate(self.notes):
-            visible = "✓" if note.get("visible", True) else "✗"
-            text = note.get("text", "")[:50]  # 只显示前50个字符
-            if len(note.get("text", "")) > 50:
-                text += "..."
-            
-            self.note_tree.insert("", tk.END, text=str(i + 1), values=(visible, text))
+            iid = f"n{self._next_iid}"
+            self._next_iid += 1
+            tk_call(widget, "insert", "", "end", "-id", iid, "-text", str(i + 1), "-values", note_values(note))
+            self._note_iids.append(iid)
+    
+    def _note_values(self, note: Dict[str, Any]) -> tuple:
+        """生成便签在列表中显示的列值"""
+        full = note.get("text", "")
+        text = full if len(full) <= 50 else full[:50] + "..."  # 只显示前50个字符
+        visible = "✓" if note.get("visible", True) else "✗"
+        return (visible, text)
+    
+    def _insert_note_row(self, note: Dict[str, Any]):
+        """在列表末尾插入一行便签"""
+        iid = f"n{self._next_iid}"
+        self._next_iid += 1
+        self.note_tree.insert("", tk.END, iid=iid, text=str(len(self._note_iids) + 1), values=self._note_values(note))
+        self._note_iids.append(iid)
     
     def _on_note_double_click(self, event):
         """双击便签时编辑"""
@@ -124,7 +144,7 @@ class NoteInterface:
         
         # 获取当前便签数据
         if index >= 0:
-            note = self.notes[index].copy()
+            note = self.notes[index]
         else:
             note = {
                 "visible": True,
@@ -158,20 +178,25 @@ class NoteInterface:
                 return
             
             # 更新或添加便签
-            note_data = {
-                "visible": visible_var.get(),
-                "backgroundImage": note.get("backgroundImage", "note.png"),
-                "text": text_content,
-                "scale": note.get("scale", 0.5)
-            }
-            
             if index >= 0:
-                self.notes[index] = note_data
+                # 直接修改原便签，backgroundImage和scale保持不变（缺失时补默认值）
+                visible = visible_var.get()
+                changed = note.get("visible", True) != visible or note.get("text", "") != text_content
+                note["visible"] = visible
+                note["text"] = text_content
+                note.setdefault("backgroundImage", "note.png")
+                note.setdefault("scale", 0.5)
+                # 显示内容未变化时不必更新列表行
+                if changed:
+                    self.note_tree.item(self._note_iids[index], values=self._note_values(note))
             else:
-                self.notes.append(note_data)
+                note["visible"] = visible_var.get()
+                note["text"] = text_content
+                self.notes.append(note)
+                self._insert_note_row(note)
+            self.config_manager.mark_modified()
             
             edit_window.destroy()
-            self._refresh_note_list()
         
         ttk.Button(button_frame, text="确定", command=save_note).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="取消", command=edit_window.destroy).pack(side=tk.LEFT, padx=5)
@@ -189,13 +214,45 @@ class NoteInterface:
             
             if 0 <= index < len(self.notes):
                 self.notes.pop(index)
-                self._refresh_note_list()
+                self.config_manager.mark_modified()
+                
+                # 只删除对应行，并为其后的行重新编号
+                self.note_tree.delete(self._note_iids.pop(index))
+                for i in range(index, len(self._note_iids)):
+                    self.note_tree.item(self._note_iids[i], text=str(i + 1))
     
     def _save_notes(self):
         """保存便签配置"""
         self.config_manager.set_notes(self.notes)
         
-        if self.config_manager.save_config():
+        # 在主线程中生成配置快照，后台线程只负责写文件，
+        # 避免与界面编辑或主窗口切换目录同时访问配置数据
+        snapshot = self.config_manager.prepare_save()
+        if snapshot is None:
+            messagebox.showerror("错误", "保存配置失败")
+            return
+        
+        # 保存期间禁用保存按钮防止重复提交；结果通过主窗口轮询，便签窗口关闭后仍能提示
+        self.save_button.config(state=tk.DISABLED)
+        threading.Thread(target=self._save_worker, args=(snapshot,), daemon=True).start()
+        self.parent.after(50, self._poll_save_queue)
+    
+    def _save_worker(self, snapshot: tuple):
+        """后台线程：将快照写入文件（此处不能访问任何Tk组件和配置数据）"""
+        self._save_queue.put((snapshot, self.config_manager.write_snapshot(snapshot)))
+    
+    def _poll_save_queue(self):
+        """主线程轮询保存结果并提示"""
+        try:
+            snapshot, key = self._save_queue.get_nowait()
+        except queue.Empty:
+            self.parent.after(50, self._poll_save_queue)
+            return
+        
+        ok = self.config_manager.finish_save(snapshot, key)
+        if self.window.winfo_exists():
+            self.save_button.config(state=tk.NORMAL)
+        if ok:
             messagebox.showinfo("成功", "便签配置已保存")
         else:
             messagebox.showerror("错误", "保存配置失败")
@@ -3,18 +3,31 @@
 包含音频播放、文件查找等工具函数
 """
 import os
+from functools import lru_cache
+from itertools import product
 from pathlib import Path
-from typing import List, Optional
-import pygame
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 import threading
 
+if TYPE_CHECKING:
+    import pygame
+
+
+@lru_cache(maxsize=8)
+def _load_sound(file_path: str, mtime_ns: int) -> "pygame.mixer.Sound":
+    """读取并解码音频文件，按(路径, 修改时间)缓存，重复播放同一文件时无需再次读盘解码"""
+    import pygame
+    return pygame.mixer.Sound(file_path)
+
 
 class AudioPlayer:
     """音频播放器类"""
     
     def __init__(self):
+        # 延迟导入pygame，避免程序启动时加载SDL拖慢主窗口显示
+        import pygame
         pygame.mixer.init()
-        self.current_channel = None
+        self._channel: Optional["pygame.mixer.Channel"] = None  # 当前播放所在的Channel
     
     def play_audio(self, file_path: str, loop: bool = False):
         """
@@ -25,66 +38,109 @@ class AudioPlayer:
             loop: 是否循环播放
         """
         try:
-            if self.current_channel:
-                self.current_channel.stop()
+            if self._channel:
+                self._channel.stop()
+            
+            try:
+                mtime_ns = os.stat(file_path).st_mtime_ns
+            except OSError:
+                return
             
-            if os.path.exists(file_path):
-                self.current_channel = pygame.mixer.Sound(file_path)
-                if loop:
-                    self.current_channel.play(-1)  # -1表示循环播放
-                else:
-                    self.current_channel.play()
+            sound = _load_sound(file_path, mtime_ns)
+            # Sound.play()返回实际播放的Channel，-1表示循环播放
+            self._channel = sound.play(-1 if loop else 0)
         except Exception as e:
             print(f"播放音频失败: {e}")
     
     def stop_audio(self):
         """停止播放音频"""
-        if self.current_channel:
-            self.current_channel.stop()
-            self.current_channel = None
+        if self._channel:
+            self._channel.stop()
+            self._channel = None
     
     def is_playing(self) -> bool:
-        """检查是否正在播放"""
-        if self.current_channel:
-            return self.current_channel.get_num_channels() > 0
-        return False
+        """检查是否正在播放（直接读取Channel状态，无需遍历所有混音通道）"""
+        return self._channel is not None and bool(self._channel.get_busy())
+
+
+# ".mp3"所有大小写组合的后缀元组，配合str.endswith使用，无需对整个文件名做lower()
+_MP3_EXTS = tuple(sorted({
+    "." + "".join(chars)
+    for chars in product(*((c.lower(), c.upper()) for c in "mp3"))
+}))
+
+
+def iter_mp3_files(directory: str) -> Iterator[str]:
+    """
+    逐个返回目录下的mp3文件名（不排序，不缓存）
+    
+    只需判断是否存在mp3文件时可以提前结束遍历；以"."开头的隐藏文件直接跳过，无需stat
+    
+    Args:
+        directory: 目录路径
+        
+    Yields:
+        str: mp3文件名（不含路径）
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name = entry.name
+            # 先用后缀元组过滤（不为每个文件名分配小写副本），再用DirEntry缓存的类型信息判断是否为文件
+            if name[0] != '.' and name.endswith(_MP3_EXTS) and entry.is_file():
+                yield name
+
+
+@lru_cache(maxsize=16)
+def _scan_mp3_files(directory: str, mtime_ns: int) -> Tuple[str, ...]:
+    """扫描目录下的mp3文件，按(目录, 修改时间)缓存结果"""
+    try:
+        return tuple(sorted(iter_mp3_files(directory)))
+    except FileNotFoundError:
+        return ()
+    except Exception as e:
+        print(f"查找mp3文件失败: {e}")
+        return ()
 
 
 def find_mp3_files(directory: str) -> List[str]:
     """
     查找目录下的所有mp3文件
     
+    目录修改时间未变化时直接返回缓存结果，不再重复扫描磁盘
+    
     Args:
         directory: 目录路径
         
     Returns:
         List[str]: mp3文件名列表（不含路径）
     """
-    mp3_files = []
     try:
-        if os.path.exists(directory):
-            for file in os.listdir(directory):
-                if file.lower().endswith('.mp3'):
-                    mp3_files.append(file)
-        mp3_files.sort()
-    except Exception as e:
-        print(f"查找mp3文件失败: {e}")
-    return mp3_files
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return []
+    return list(_scan_mp3_files(directory, mtime_ns))
+
+
+def clear_mp3_cache():
+    """清空mp3文件列表缓存"""
+    _scan_mp3_files.cache_clear()
 
 
+@lru_cache(maxsize=1440)
 def seconds_to_time(seconds: int) -> str:
     """
     将秒数转换为时间字符串 (HH:MM)
     
+    一天只有1440种不同的分钟值，结果全部缓存
+    
     Args:
         seconds: 秒数（0-86399）
         
     Returns:
         str: 时间字符串，格式为 "HH:MM"
     """
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    return f"{hours:02d}:{minutes:02d}"
+    hours, rem = divmod(seconds, 3600)
+    return f"{hours:02d}:{rem // 60:02d}"
 
 
 def time_to_seconds(time_str: str) -> int:
@@ -97,13 +153,11 @@ def time_to_seconds(time_str: str) -> int:
     Returns:
         int: 秒数（0-86399），失败返回-1
     """
-    try:
-        parts = time_str.split(':')
-        if len(parts) == 2:
-            hours = int(parts[0])
-            minutes = int(parts[1])
-            if 0 <= hours < 24 and 0 <= minutes < 60:
-                return hours * 3600 + minutes * 60
-    except Exception as e:
-        print(f"时间转换失败: {e}")
+    # partition不创建列表，isdecimal预先校验，非法输入无需走异常分支
+    hours, sep, minutes = time_str.strip().partition(':')
+    hours, minutes = hours.strip(), minutes.strip()
+    if sep and hours.isdecimal() and minutes.isdecimal():
+        h, m = int(hours), int(minutes)
+        if h < 24 and m < 60:
+            return h * 3600 + m * 60
     return -1